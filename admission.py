@@ -0,0 +1,111 @@
+"""
+Admission control - defers or sheds expensive prompts when the host is busy.
+
+A system snapshot (load average, memory, number of child processes) is
+sampled at most every SNAPSHOT_TTL seconds and also written to
+SNAPSHOT_FILE, so tools like system_info can read it instead of calling
+psutil themselves. Prompts listed in [admission].expensive wait up to
+defer_seconds for load to drop and are shed if it doesn't.
+"""
+
+import os
+import json
+import time
+import asyncio
+
+import psutil
+
+import metrics
+
+SNAPSHOT_FILE = "/tmp/dotprompt_system.json"
+SNAPSHOT_TTL = 2.0
+POLL_INTERVAL = 2.0
+
+_snapshot = None
+_sampled = 0.0
+
+
+def snapshot() -> dict:
+    """Cheap, cached view of host load shared with the tools."""
+    global _snapshot, _sampled
+    now = time.monotonic()
+    if _snapshot is None or now - _sampled >= SNAPSHOT_TTL:
+        memory = psutil.virtual_memory()
+        try:
+            children = len(psutil.Process().children(recursive=True))
+        except psutil.Error:
+            children = 0
+        _snapshot = {
+            "time": time.time(),
+            "cpu_count": psutil.cpu_count(logical=True),
+            "load": os.getloadavg(),
+            "memory": {
+                "total": memory.total,
+                "available": memory.available,
+                "used": memory.used,
+                "percent": memory.percent,
+            },
+            "children": children,
+        }
+        _sampled = now
+        tmp = f"{SNAPSHOT_FILE}.{os.getpid()}"
+        with open(tmp, "w") as f:
+            json.dump(_snapshot, f)
+        os.replace(tmp, SNAPSHOT_FILE)
+    return _snapshot
+
+
+class AdmissionController:
+    def __init__(self, expensive: list = None, max_load_per_cpu: float = 1.5,
+                 max_memory_percent: float = 90, max_children: int = 24, defer_seconds: int = 30):
+        self.expensive = set(expensive or [])
+        self.max_load_per_cpu = max_load_per_cpu
+        self.max_memory_percent = max_memory_percent
+        self.max_children = max_children
+        self.defer_seconds = defer_seconds
+
+    @classmethod
+    def from_config(cls, config: dict):
+        admission = config.get("admission", {})
+        return cls(
+            expensive=admission.get("expensive", ["bash", "estimate_today", "obsidian"]),
+            max_load_per_cpu=admission.get("max_load_per_cpu", 1.5),
+            max_memory_percent=admission.get("max_memory_percent", 90),
+            max_children=admission.get("max_children", 24),
+            defer_seconds=admission.get("defer_seconds", 30),
+        )
+
+    def overloaded(self):
+        """Reason the host is too busy for an expensive prompt, or None."""
+        stats = snapshot()
+        load = stats["load"][0] / (stats["cpu_count"] or 1)
+        if load > self.max_load_per_cpu:
+            return f"load {stats['load'][0]:.1f} on {stats['cpu_count']} CPUs"
+        if stats["memory"]["percent"] > self.max_memory_percent:
+            return f"memory {stats['memory']['percent']:.0f}% used"
+        if stats["children"] > self.max_children:
+            return f"{stats['children']} child processes running"
+        return None
+
+    async def admit(self, prompt_name: str, notify=None):
+        """Wait until ``prompt_name`` may run. Returns None, or the reason it was shed.
+
+        ``notify(reason)`` is awaited once if the prompt has to wait.
+        """
+        if prompt_name not in self.expensive:
+            return None
+        reason = self.overloaded()
+        if not reason:
+            return None
+
+        metrics.incr(f"admission.deferred.{prompt_name}")
+        if notify:
+            await notify(reason)
+        deadline = time.monotonic() + self.defer_seconds
+        while time.monotonic() < deadline:
+            await asyncio.sleep(POLL_INTERVAL)
+            reason = self.overloaded()
+            if not reason:
+                return None
+        metrics.incr(f"admission.shed.{prompt_name}")
+        return reason
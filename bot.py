@@ -6,14 +6,22 @@ DotPrompt Bot - Telegram bot that delegates to runprompt subagents
 import os
 import json
 import asyncio
+import functools
 import tempfile
 import tomllib
 import yaml
 from pathlib import Path
 from groq import Groq
-from telegram.ext import ApplicationBuilder, ApplicationHandlerStop, MessageHandler, filters
+from telegram.ext import ApplicationBuilder, ApplicationHandlerStop, CommandHandler, MessageHandler, filters
 from telegram import Update
 from dotenv import load_dotenv
+from prompt_pool import PromptPool, run_subprocess
+from briefing import Briefing, PROMPT_NAME as BRIEFING_PROMPT
+from model_tiers import ModelTiers
+from decision import DecisionError, extract_json, parse_decisions
+from admission import AdmissionController, snapshot as system_snapshot
+from job_runner import JobRunner
+import metrics
 
 load_dotenv()
 
@@ -28,6 +36,12 @@ def load_config() -> dict:
         return tomllib.load(f)
 
 groq_client = Groq(api_key=os.getenv("GROQ_API_KEY"))
+prompt_pool = None
+morning_briefing = None
+model_tiers = None
+admission = None
+job_runner = None
+dispatch_limit = None
 
 
 def discover_prompts() -> dict:
@@ -43,71 +57,141 @@ def discover_prompts() -> dict:
                 config = yaml.safe_load(parts[1])
                 name = prompt_file.stem
                 prompts[name] = {
+                    "name": config.get("name", name),
                     "description": config.get("description", ""),
                     "file": str(prompt_file),
+                    "schema": (config.get("input") or {}).get("schema", {}),
                 }
         except Exception as e:
             print(f"Warning: failed to load {prompt_file}: {e}")
     return prompts
 
 
-async def run_prompt(prompt_file: str, input_data: dict, tool_path: str = None) -> str:
-    """Run a .prompt file via runprompt subprocess."""
-    cmd = ["runprompt", "--safe-yes"]
+async def run_prompt(prompt_file: str, input_data: dict, tool_path: str = None,
+                     model: str = None, env: dict = None) -> str:
+    """Run a .prompt file via runprompt, on a warm pool worker when available.
+
+    ``env`` adds environment variables for the run (e.g. DOTPROMPT_CHAT_ID,
+    so background jobs know which chat to report to).
+    """
+    args = ["--safe-yes"]
     if tool_path:
-        cmd.extend(["--tool-path", tool_path])
-    cmd.append(prompt_file)
-
-    proc = await asyncio.create_subprocess_exec(
-        *cmd,
-        stdin=asyncio.subprocess.PIPE,
-        stdout=asyncio.subprocess.PIPE,
-        stderr=asyncio.subprocess.PIPE,
-    )
+        args.extend(["--tool-path", tool_path])
+    if model:
+        args.extend(["--model", model])
+    args.append(prompt_file)
 
-    stdout, stderr = await proc.communicate(json.dumps(input_data).encode())
+    if prompt_pool:
+        returncode, stdout, stderr = await prompt_pool.run(args, input_data, env)
+    else:
+        returncode, stdout, stderr = await run_subprocess(args, input_data, env)
 
-    if proc.returncode != 0:
-        raise RuntimeError(f"runprompt failed (exit {proc.returncode}): {stderr.decode()}")
+    if returncode != 0:
+        raise RuntimeError(f"runprompt failed (exit {returncode}): {stderr}")
 
-    return stdout.decode().strip()
+    return stdout.strip()
 
 
-async def route_and_respond(update: Update, context, user_message: str):
-    """Route a message through the prompt system and reply."""
-    await context.bot.send_chat_action(
-        chat_id=update.effective_chat.id, action="typing"
+async def run_tiered(prompt_name: str, prompt_file: str, input_data: dict,
+                     tool_path: str = None, accept=None, env: dict = None) -> str:
+    """Run a prompt on the model picked by the tiering engine."""
+    return await model_tiers.run(
+        prompt_name,
+        lambda model: run_prompt(prompt_file, input_data, tool_path, model=model, env=env),
+        accept=accept,
     )
 
+
+def router_confident(output: str) -> bool:
+    """Accept a router answer only if it holds JSON with enough confidence."""
+    decision, _ = extract_json(output)
+    min_confidence = load_config().get("models", {}).get("min_confidence", 0.6)
+    return decision.get("confidence", 1.0) >= min_confidence
+
+
+async def route(user_message: str, prompts: dict) -> list:
+    """Ask the router which prompt(s) handle the message.
+
+    Noisy or slightly wrong router output is repaired locally; the router is
+    only asked again, with a targeted correction, when that fails.
+    """
+    prompt_list = "\n".join(
+        f"- {name}: {info['description']}" for name, info in prompts.items()
+    )
+    router_input = {"message": user_message, "prompts": prompt_list}
+    router_output = await run_tiered("router", str(ROUTER_PROMPT), router_input, accept=router_confident)
     try:
-        prompts = discover_prompts()
-        prompt_list = "\n".join(
-            f"- {name}: {info['description']}" for name, info in prompts.items()
-        )
+        return parse_decisions(router_output, prompts, user_message)
+    except DecisionError as e:
+        problem = str(e)
+        print(f"Router output rejected ({problem}), asking again: {router_output!r}")
+        metrics.incr("router.requeried")
+
+    router_input["correction"] = (
+        f"Your previous reply was invalid ({problem}):\n{router_output}\n"
+        "Reply again with only a corrected JSON object."
+    )
+    router_output = await run_tiered("router", str(ROUTER_PROMPT), router_input, accept=router_confident)
+    return parse_decisions(router_output, prompts, user_message)
 
-        router_input = {"message": user_message, "prompts": prompt_list}
-        router_output = await run_prompt(str(ROUTER_PROMPT), router_input)
 
-        decision = json.loads(router_output)
-        print(f"Router decision: {decision}")
+async def respond(update: Update, decision: dict, prompts: dict) -> str:
+    """Produce the reply for one router decision."""
+    selected_prompt = decision.get("prompt")
 
-        selected_prompt = decision.get("prompt")
+    if selected_prompt == BRIEFING_PROMPT and morning_briefing and morning_briefing.fresh():
+        return morning_briefing.reply()
 
-        if selected_prompt and selected_prompt in prompts:
-            prompt_input = decision.get("input", {})
-            response = await run_prompt(
-                prompts[selected_prompt]["file"],
-                prompt_input,
-                tool_path="./tools",
-            )
-        else:
-            response = decision.get("answer", "I'm not sure how to handle that.")
+    if not selected_prompt or selected_prompt not in prompts:
+        return decision.get("answer", "I'm not sure how to handle that.")
+
+    async def notify_busy(reason):
+        await update.message.reply_text(f"The server is busy ({reason}), I'll start on {selected_prompt} shortly.")
 
-        await update.message.reply_text(response)
+    shed_reason = await admission.admit(selected_prompt, notify=notify_busy)
+    if shed_reason:
+        return (f"Sorry, the server is too busy to run {selected_prompt} right now "
+                f"({shed_reason}). Please try again in a bit.")
+
+    # Taken only after admission, so a deferred prompt doesn't hold a slot while it waits
+    async with dispatch_limit:
+        return await run_tiered(
+            selected_prompt,
+            prompts[selected_prompt]["file"],
+            decision.get("input", {}),
+            tool_path="./tools",
+            env={"DOTPROMPT_CHAT_ID": str(update.effective_chat.id)},
+        )
+
+
+async def route_and_respond(update: Update, context, user_message: str):
+    """Route a message through the prompt system and reply.
 
+    A compound message can route to several prompts; they run concurrently
+    (within the dispatch limit) and each reply is sent as soon as it is ready.
+    """
+    await context.bot.send_chat_action(
+        chat_id=update.effective_chat.id, action="typing"
+    )
+
+    try:
+        prompts = discover_prompts()
+        decisions = await route(user_message, prompts)
+        print(f"Router decisions: {decisions}")
     except Exception as e:
         print(f"Error: {e}")
         await update.message.reply_text(f"Sorry, something went wrong: {e}")
+        return
+
+    async def run_one(decision):
+        try:
+            return await respond(update, decision, prompts)
+        except Exception as e:
+            print(f"Error: {e}")
+            return f"Sorry, something went wrong: {e}"
+
+    for next_reply in asyncio.as_completed([run_one(decision) for decision in decisions]):
+        await update.message.reply_text(await next_reply)
 
 
 async def handle_ask_reply(update: Update, context):
@@ -139,6 +223,14 @@ async def handle_ask_reply(update: Update, context):
             raise ApplicationHandlerStop
 
 
+async def handle_metrics(update: Update, context):
+    """Reply with bot metrics to authorized users."""
+    authorized_users = load_config().get("telegram", {}).get("authorized_users", [])
+    if update.effective_user.id not in authorized_users:
+        return
+    await update.message.reply_text(metrics.report())
+
+
 async def handle_message(update: Update, context):
     """Handle incoming text message."""
     user_message = update.message.text
@@ -182,7 +274,47 @@ async def handle_voice(update: Update, context):
         os.unlink(tmp_path)
 
 
+async def start_pool(app):
+    """Start the warm runprompt worker pool unless disabled in config.toml."""
+    global prompt_pool
+    config = load_config()
+    if not config.get("pool", {}).get("enabled", True):
+        return
+    pool = PromptPool.from_config(config, tool_path="./tools")
+    try:
+        await pool.start()
+    except Exception as e:
+        print(f"Warning: prompt pool unavailable, falling back to subprocesses: {e}")
+        return
+    prompt_pool = pool
+    print(f"Prompt pool started ({pool.min_workers}-{pool.max_workers} workers)")
+
+
+async def stop_pool(app):
+    if prompt_pool:
+        await prompt_pool.close()
+
+
+async def startup(app):
+    global job_runner
+    await start_pool(app)
+    job_runner = JobRunner.from_config(app.bot, load_config())
+    await job_runner.start()
+
+
+async def shutdown(app):
+    if job_runner:
+        await job_runner.stop()
+    await stop_pool(app)
+
+
+async def refresh_system_snapshot(context):
+    """Keep the shared system snapshot fresh for tools reading it."""
+    system_snapshot()
+
+
 def main():
+    global morning_briefing, model_tiers, admission, dispatch_limit
     token = os.getenv("TELEGRAM_TOKEN")
     if not token:
         print("Error: TELEGRAM_TOKEN not set in environment")
@@ -192,8 +324,20 @@ def main():
     prompts = discover_prompts()
     print(f"Discovered prompts: {list(prompts.keys())}")
 
-    app = ApplicationBuilder().token(token).build()
+    app = ApplicationBuilder().token(token).post_init(startup).post_shutdown(shutdown).build()
+
+    model_tiers = ModelTiers.from_config(load_config())
+    admission = AdmissionController.from_config(load_config())
+    dispatch_limit = asyncio.Semaphore(load_config().get("dispatch", {}).get("max_concurrent", 3))
+    app.job_queue.run_repeating(refresh_system_snapshot, interval=10, first=0, name="system snapshot")
+    morning_briefing = Briefing(
+        functools.partial(run_tiered, BRIEFING_PROMPT),
+        load_config,
+        str(PROMPTS_DIR / f"{BRIEFING_PROMPT}.prompt"),
+    )
+    morning_briefing.schedule(app.job_queue, load_config())
     app.add_handler(MessageHandler(filters.TEXT & filters.REPLY & ~filters.COMMAND, handle_ask_reply), group=-1)
+    app.add_handler(CommandHandler("metrics", handle_metrics))
     app.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, handle_message))
     app.add_handler(MessageHandler(filters.VOICE | filters.AUDIO, handle_voice))
 
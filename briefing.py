@@ -0,0 +1,154 @@
+"""
+Morning briefing - precomputes the estimate_today plan on the job queue.
+
+At the times configured under [briefing] in config.toml a calendar + todo
+snapshot is taken and the estimate_today prompt is run on it. The draft is
+cached (in memory and on disk) and served instantly when the user asks for
+today's plan. It is invalidated when today's diary file changes, when a
+periodic calendar check sees different events, or when the day rolls over.
+
+Builds run unattended, so the prompt gets ``unattended: true`` and
+DOTPROMPT_UNATTENDED is set: ask.ask refuses instead of DMing the user and
+blocking the job until its timeout.
+"""
+
+import json
+import asyncio
+import hashlib
+import datetime as dt
+from pathlib import Path
+
+from tools._parallel import load_tool
+
+CACHE_FILE = Path("/tmp/dotprompt_briefing.json")
+PROMPT_NAME = "estimate_today"
+
+
+def _hash(text: str) -> str:
+    return hashlib.sha1(text.encode()).hexdigest()
+
+
+def _diary_path(config: dict) -> Path:
+    base = Path(config.get("paths", {}).get("diary", "~/diary")).expanduser()
+    return base / f"{dt.date.today().isoformat()}.md"
+
+
+def _mtime(path: Path):
+    try:
+        return path.stat().st_mtime
+    except OSError:
+        return None
+
+
+def _clock(timestamp: float) -> str:
+    return dt.datetime.fromtimestamp(timestamp).strftime("%H:%M")
+
+
+class Briefing:
+    """Cached estimate_today draft plus the snapshot it was built from."""
+
+    def __init__(self, run_prompt, load_config, prompt_file: str):
+        self.run_prompt = run_prompt
+        self.load_config = load_config
+        self.prompt_file = prompt_file
+        self.draft = None
+        self.last_built = None
+        self._building = asyncio.Lock()
+        if CACHE_FILE.exists():
+            try:
+                self.draft = json.loads(CACHE_FILE.read_text())
+                self.last_built = self.draft["date"]
+            except (OSError, KeyError, json.JSONDecodeError):
+                pass
+
+    async def snapshot(self) -> str:
+        """Today's calendar events and todo file, via today.get_overview."""
+        return await asyncio.to_thread(load_tool("today").get_overview)
+
+    async def build(self):
+        """Take a fresh snapshot and run estimate_today on it."""
+        async with self._building:
+            # Taken before the snapshot, so edits made while the LLM runs invalidate the draft
+            diary_mtime = _mtime(_diary_path(self.load_config()))
+            snapshot_date = dt.date.today().isoformat()
+            checked = dt.datetime.now().timestamp()
+            overview = await self.snapshot()
+            plan = await self.run_prompt(
+                self.prompt_file,
+                {"overview": overview, "unattended": True},
+                tool_path="./tools",
+                env={"DOTPROMPT_UNATTENDED": "1"},
+            )
+            self.draft = {
+                "date": snapshot_date,
+                "plan": plan,
+                "built": dt.datetime.now().timestamp(),
+                "calendar_checked": checked,
+                "overview_hash": _hash(overview),
+                "diary_mtime": diary_mtime,
+            }
+            self.last_built = self.draft["date"]
+            CACHE_FILE.write_text(json.dumps(self.draft))
+            print(f"Briefing draft built for {self.draft['date']}")
+
+    def invalidate(self, reason: str):
+        if self.draft:
+            print(f"Briefing draft invalidated: {reason}")
+        self.draft = None
+        CACHE_FILE.unlink(missing_ok=True)
+
+    def fresh(self) -> bool:
+        """True if the cached draft still matches today's diary file."""
+        if not self.draft:
+            return False
+        if self.draft["date"] != dt.date.today().isoformat():
+            self.invalidate("new day")
+            return False
+        if _mtime(_diary_path(self.load_config())) != self.draft["diary_mtime"]:
+            self.invalidate("diary file changed")
+            return False
+        return True
+
+    def reply(self) -> str:
+        """The cached plan followed by its freshness metadata."""
+        return (
+            f"{self.draft['plan']}\n\n"
+            f"(prepared at {_clock(self.draft['built'])}, "
+            f"calendar checked at {_clock(self.draft['calendar_checked'])}, "
+            f"diary unchanged since then)"
+        )
+
+    async def scheduled_build(self, context):
+        try:
+            await self.build()
+        except Exception as e:
+            print(f"Warning: briefing build failed: {e}")
+
+    async def check_calendar(self, context):
+        """Rebuild today's draft if the overview or diary changed since it was built."""
+        if not self.fresh():
+            if self.last_built == dt.date.today().isoformat():
+                await self.scheduled_build(context)
+            return
+        if _hash(await self.snapshot()) == self.draft.get("overview_hash"):
+            self.draft["calendar_checked"] = dt.datetime.now().timestamp()
+            CACHE_FILE.write_text(json.dumps(self.draft))
+            return
+        self.invalidate("calendar or todo file changed")
+        await self.scheduled_build(context)
+
+    def schedule(self, job_queue, config: dict):
+        """Register the daily builds and periodic calendar checks on the job queue."""
+        briefing_config = config.get("briefing", {})
+        times = briefing_config.get("times", [])
+        if not times:
+            return
+        tz = dt.datetime.now().astimezone().tzinfo
+        for hhmm in times:
+            hour, minute = map(int, hhmm.split(":"))
+            job_queue.run_daily(self.scheduled_build, time=dt.time(hour, minute, tzinfo=tz),
+                                name=f"briefing {hhmm}")
+        interval = briefing_config.get("refresh_minutes", 30) * 60
+        job_queue.run_repeating(self.check_calendar, interval=interval, first=interval,
+                                name="briefing calendar check")
+        print(f"Briefing scheduled at {', '.join(times)}")
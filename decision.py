@@ -0,0 +1,213 @@
+"""
+Decision - tolerant parsing of the router's JSON output.
+
+The router is asked for a single JSON object, but models wrap it in prose
+or code fences, leave trailing commas, or get cut off at max_tokens.
+parse_decisions() extracts and repairs what it can locally and validates
+each ``input`` against the selected prompt's ``input.schema``. It only
+raises DecisionError (and the caller re-queries the router) when that fails.
+
+Compound messages may route to several prompts at once:
+``{"prompts": [{"prompt": ..., "input": {...}}, ...]}``.
+"""
+
+import re
+import json
+import difflib
+
+import metrics
+
+_FENCE = re.compile(r"```(?:json)?\s*(.*?)```", re.S)
+_TRAILING_COMMA = re.compile(r",\s*([}\]])")
+
+
+class DecisionError(ValueError):
+    """Router output that could not be repaired locally."""
+
+
+def _close_truncated(text: str) -> str:
+    """Append the quotes/brackets a cut-off JSON object is missing.
+
+    A value cut off inside ``input`` (a string, or a number/literal that may
+    be missing digits) can't be completed without guessing, so that raises
+    DecisionError instead.
+    """
+    stack = []
+    # key each open container sits under, e.g. ["prompts", None, "input"]
+    path = []
+    in_string = escaped = False
+    string = key = None
+    for char in text:
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+            else:
+                string.append(char)
+        elif char == '"':
+            in_string = True
+            string = []
+        elif char == ":":
+            key = "".join(string or [])
+        elif char in "{[":
+            stack.append("}" if char == "{" else "]")
+            path.append(key)
+            key = None
+        elif char in "}]" and stack:
+            stack.pop()
+            path.pop()
+        elif char == ",":
+            key = None
+    stripped = text.rstrip()
+    in_value = in_string or (stripped and stripped[-1] not in '"{}[],:')
+    if in_value and ("input" in path or key == "input"):
+        raise DecisionError("output was cut off inside an input value")
+    if in_string:
+        text += '"'
+    text = re.sub(r",\s*$", "", text.rstrip())
+    text = re.sub(r'(,\s*"[^"]*"\s*:?)\s*$', "", text)
+    return text + "".join(reversed(stack))
+
+
+def extract_json(text: str) -> tuple:
+    """Find the JSON object in noisy output. Returns (object, repaired)."""
+    fenced = _FENCE.search(text)
+    candidate = fenced.group(1) if fenced else text
+    start = candidate.find("{")
+    if start < 0:
+        raise DecisionError("no JSON object found")
+    candidate = candidate[start:]
+
+    try:
+        obj, end = json.JSONDecoder().raw_decode(candidate)
+        return obj, bool(fenced) or candidate[end:].strip() != "" or start > 0
+    except json.JSONDecodeError:
+        pass
+
+    for repair in (
+        lambda s: _TRAILING_COMMA.sub(r"\1", s),
+        lambda s: _TRAILING_COMMA.sub(r"\1", _close_truncated(s)),
+    ):
+        try:
+            obj, _ = json.JSONDecoder().raw_decode(repair(candidate))
+            return obj, True
+        except json.JSONDecodeError:
+            continue
+    raise DecisionError("output is not valid JSON")
+
+
+def _coerce(value, type_name: str):
+    if type_name == "string":
+        if isinstance(value, (dict, list)):
+            return json.dumps(value)
+        return str(value)
+    if type_name == "integer":
+        if isinstance(value, bool):
+            raise ValueError
+        if isinstance(value, float) and value.is_integer():
+            return int(value)
+        return value if isinstance(value, int) else int(str(value).strip())
+    if type_name == "number":
+        if isinstance(value, bool):
+            raise ValueError
+        return value if isinstance(value, (int, float)) else float(str(value).strip())
+    if type_name == "boolean":
+        if isinstance(value, bool):
+            return value
+        lowered = str(value).strip().lower()
+        if lowered in ("true", "yes", "1"):
+            return True
+        if lowered in ("false", "no", "0"):
+            return False
+        raise ValueError
+    return value
+
+
+def validate_input(input_data, schema: dict, message: str) -> tuple:
+    """Check input against a Picoschema-style ``input.schema``.
+
+    Coerces scalar types, drops unknown fields and fills a single missing
+    required string field with ``message`` if one is given. Returns
+    (input, repaired).
+    """
+    if not isinstance(input_data, dict):
+        input_data = {}
+    fields = {}
+    for key, spec in (schema or {}).items():
+        name, optional = (key[:-1], True) if key.endswith("?") else (key, False)
+        fields[name] = (str(spec).split(",")[0].strip(), optional)
+
+    repaired = False
+    cleaned = {}
+    for name, value in input_data.items():
+        # null is no value: treat it as missing rather than the string "None"
+        if name not in fields or value is None:
+            repaired = True
+            continue
+        type_name, _ = fields[name]
+        try:
+            coerced = _coerce(value, type_name)
+        except (TypeError, ValueError):
+            raise DecisionError(f"input field '{name}' should be {type_name}, got {value!r}")
+        repaired = repaired or coerced != value or type(coerced) is not type(value)
+        cleaned[name] = coerced
+
+    missing = [n for n, (_, optional) in fields.items() if not optional and n not in cleaned]
+    if len(missing) == 1 and fields[missing[0]][0] == "string" and message:
+        cleaned[missing[0]] = message
+        repaired = True
+    elif missing:
+        raise DecisionError(f"missing required input fields: {', '.join(missing)}")
+    return cleaned, repaired
+
+
+def _check_decision(decision, prompts: dict, message: str) -> bool:
+    """Validate and repair one decision in place. Returns whether it was repaired."""
+    if not isinstance(decision, dict):
+        raise DecisionError("decision is not a JSON object")
+    repaired = False
+
+    selected = decision.get("prompt")
+    if selected and selected not in prompts:
+        aliases = {info.get("name") or name: name for name, info in prompts.items()}
+        match = aliases.get(selected) or next(
+            iter(difflib.get_close_matches(selected, list(prompts) + list(aliases), n=1, cutoff=0.6)), None)
+        if not match:
+            raise DecisionError(f"unknown prompt '{selected}'; choose one of: {', '.join(prompts)}")
+        decision["prompt"] = aliases.get(match, match)
+        repaired = True
+
+    if decision.get("prompt"):
+        decision["input"], input_repaired = validate_input(
+            decision.get("input"), prompts[decision["prompt"]].get("schema", {}), message)
+        repaired = repaired or input_repaired
+    elif not decision.get("answer"):
+        raise DecisionError("no prompt selected and no answer given")
+    return repaired
+
+
+def parse_decisions(output: str, prompts: dict, message: str) -> list:
+    """Turn router output into a list of ``{"prompt", "input"}`` / ``{"prompt": None, "answer"}``."""
+    try:
+        decision, repaired = extract_json(output)
+        if isinstance(decision, dict) and isinstance(decision.get("prompts"), list):
+            decisions = decision["prompts"]
+            if not decisions:
+                raise DecisionError("\"prompts\" list is empty")
+        else:
+            decisions = [decision]
+        # With several prompts the whole message is not any one prompt's input
+        fill = message if len(decisions) == 1 else None
+        for item in decisions:
+            repaired = _check_decision(item, prompts, fill) or repaired
+    except DecisionError:
+        metrics.incr("router.decision_failed")
+        raise
+
+    metrics.incr("router.decision_repaired" if repaired else "router.decision_ok")
+    if len(decisions) > 1:
+        metrics.incr("router.multi_intent")
+    return decisions
@@ -0,0 +1,116 @@
+"""
+Job runner - runs background jobs queued by tools in tools/_jobs.py.
+
+A bounded set of asyncio workers claims queued jobs from SQLite, runs each
+command with its output appended to the job's log file, and sends the
+result to the chat that started it. Jobs that were running when the bot
+stopped are marked interrupted on startup and reported as such; finished
+jobs whose notification never went out are reported again.
+"""
+
+import os
+import signal
+import asyncio
+
+from tools import _jobs
+
+POLL_INTERVAL = 2.0
+# Telegram caps messages at 4096 characters
+MAX_MESSAGE = 4000
+
+
+class JobRunner:
+    def __init__(self, bot, workers: int = 2):
+        self.bot = bot
+        self.workers = max(workers, 1)
+        self._tasks = []
+        self._notifying = asyncio.Lock()
+
+    @classmethod
+    def from_config(cls, bot, config: dict):
+        return cls(bot, workers=config.get("jobs", {}).get("workers", 2))
+
+    async def start(self):
+        interrupted = await asyncio.to_thread(_jobs.interrupt_running)
+        if interrupted:
+            print(f"Jobs interrupted by restart: {interrupted}")
+        await self.notify_finished()
+        self._tasks = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _work(self):
+        while True:
+            try:
+                job = await asyncio.to_thread(_jobs.claim_next)
+            except Exception as e:
+                print(f"Warning: failed to claim job: {e}")
+                job = None
+            if not job:
+                await asyncio.sleep(POLL_INTERVAL)
+                continue
+            try:
+                await self._run(job)
+            except Exception as e:
+                print(f"Warning: job #{job['id']} failed to run: {e}")
+                try:
+                    await asyncio.to_thread(_jobs.finish, job["id"], "failed", None)
+                except Exception as e:
+                    print(f"Warning: failed to mark job #{job['id']} as failed: {e}")
+            try:
+                await self.notify_finished()
+            except Exception as e:
+                print(f"Warning: failed to report finished jobs: {e}")
+
+    async def _run(self, job):
+        print(f"Running job #{job['id']} ({job['name']}): {job['command']}")
+        with open(job["log_path"], "ab") as log:
+            # Own process group, so killing the job also stops what the shell started
+            proc = await asyncio.create_subprocess_shell(
+                job["command"], stdout=log, stderr=asyncio.subprocess.STDOUT,
+                start_new_session=True,
+            )
+            try:
+                exit_code = await asyncio.wait_for(proc.wait(), timeout=job["timeout"])
+            except asyncio.TimeoutError:
+                _kill_group(proc)
+                await proc.wait()
+                log.write(f"\n[killed after {job['timeout']}s timeout]\n".encode())
+                await asyncio.to_thread(_jobs.finish, job["id"], "failed", None)
+                return
+            except asyncio.CancelledError:
+                # Bot shutting down: the job is reported as interrupted on next start.
+                _kill_group(proc)
+                raise
+        status = "done" if exit_code == 0 else "failed"
+        await asyncio.to_thread(_jobs.finish, job["id"], status, exit_code)
+
+    async def notify_finished(self):
+        """Send results of finished jobs to the chats that started them."""
+        async with self._notifying:
+            for job in await asyncio.to_thread(_jobs.unnotified):
+                if job["chat_id"]:
+                    try:
+                        await self.bot.send_message(chat_id=job["chat_id"], text=_message(job))
+                    except Exception as e:
+                        print(f"Warning: failed to report job #{job['id']}: {e}")
+                        continue
+                await asyncio.to_thread(_jobs.mark_notified, job["id"])
+
+
+def _kill_group(proc):
+    try:
+        os.killpg(proc.pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
+
+
+def _message(job) -> str:
+    header, _, output = _jobs.describe(job).partition("\n")
+    if len(header) + len(output) > MAX_MESSAGE:
+        output = "..." + output[-(MAX_MESSAGE - len(header) - 4):]
+    return f"{header}\n{output}" if output else header
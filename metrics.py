@@ -0,0 +1,28 @@
+"""
+Metrics - in-process counters reported by the /metrics command.
+
+Modules bump counters with incr() and can register a section() callback
+that renders their own lines (e.g. per-model latency).
+"""
+
+from collections import Counter
+
+counters = Counter()
+_sections = []
+
+
+def incr(name: str, amount: float = 1):
+    counters[name] += amount
+
+
+def section(render):
+    """Register a callable returning a list of extra report lines."""
+    _sections.append(render)
+    return render
+
+
+def report() -> str:
+    lines = [f"{name}: {round(value, 2)}" for name, value in sorted(counters.items())]
+    for render in _sections:
+        lines.extend(render())
+    return "\n".join(lines) or "No metrics yet."
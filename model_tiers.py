@@ -0,0 +1,168 @@
+"""
+Model tiers - picks the model for each prompt run.
+
+Prompts listed in [models].fast_prompts try the fastest healthy model of
+the fast tier first and escalate to the large tier when the run fails or
+its output is rejected (invalid JSON, low confidence). A fast model that
+keeps failing or keeps getting rejected is skipped, and with none left the
+run goes straight to the large tier. Rolling latency, error and rejection
+rates are tracked per (prompt, model), since one prompt's tool runs say
+nothing about another's latency. Escalations and latency saved show up in
+/metrics.
+
+Prompts not in fast_prompts, and every prompt without a [models] section
+in config.toml, keep the model from their own frontmatter.
+"""
+
+import time
+import statistics
+from collections import deque
+
+import metrics
+
+WINDOW = 20
+MIN_SAMPLES = 3
+MAX_ERROR_RATE = 0.5
+MAX_REJECTED_RATE = 0.5
+# Unhealthy models get another try after this many seconds
+COOLDOWN = 300
+
+
+class Rejected(ValueError):
+    """Output that ran fine but was turned down by ``accept``."""
+
+
+class ModelStats:
+    def __init__(self):
+        # (latency, outcome) with outcome "ok", "rejected" or "error"
+        self.samples = deque(maxlen=WINDOW)
+        self.last_seen = {}
+
+    def record(self, latency: float, outcome: str):
+        self.samples.append((latency, outcome))
+        self.last_seen[outcome] = time.monotonic()
+
+    @property
+    def latency(self):
+        latencies = [latency for latency, outcome in self.samples if outcome != "error"]
+        return statistics.mean(latencies) if latencies else None
+
+    def rate(self, outcome: str) -> float:
+        if not self.samples:
+            return 0.0
+        return sum(1 for _, o in self.samples if o == outcome) / len(self.samples)
+
+    @property
+    def error_rate(self) -> float:
+        return self.rate("error")
+
+    def _below(self, outcome: str, max_rate: float) -> bool:
+        return (len(self.samples) < MIN_SAMPLES or self.rate(outcome) < max_rate
+                or time.monotonic() - self.last_seen.get(outcome, 0.0) > COOLDOWN)
+
+    def healthy(self, max_rejected: float = None) -> bool:
+        """Few enough errors (and, if ``max_rejected`` is given, rejections)."""
+        return self._below("error", MAX_ERROR_RATE) and (
+            max_rejected is None or self._below("rejected", max_rejected))
+
+
+class ModelTiers:
+    def __init__(self, fast: list = None, large: list = None, fast_prompts: list = None):
+        self.fast = fast or []
+        self.large = large or []
+        self.fast_prompts = set(fast_prompts or [])
+        self.stats = {}
+        metrics.section(self.report)
+
+    @classmethod
+    def from_config(cls, config: dict):
+        models = config.get("models", {})
+
+        def as_list(value):
+            return [value] if isinstance(value, str) else list(value or [])
+
+        return cls(
+            fast=as_list(models.get("fast")),
+            large=as_list(models.get("large")),
+            fast_prompts=models.get("fast_prompts", ["router"]),
+        )
+
+    def _stats(self, prompt_name: str, model: str) -> ModelStats:
+        return self.stats.setdefault((prompt_name, model), ModelStats())
+
+    def pick(self, prompt_name: str, candidates: list, fallback: bool = True, max_rejected: float = None):
+        """Fastest healthy model for this prompt; untried models first so they get measured.
+
+        Without ``fallback`` returns None when no candidate is healthy.
+        """
+        if not candidates:
+            return None
+        healthy = [m for m in candidates if self._stats(prompt_name, m).healthy(max_rejected)]
+        if not healthy:
+            if not fallback:
+                return None
+            healthy = candidates
+        untried = [m for m in healthy if self._stats(prompt_name, m).latency is None]
+        if untried:
+            return untried[0]
+        return min(healthy, key=lambda m: (self._stats(prompt_name, m).error_rate,
+                                           self._stats(prompt_name, m).latency))
+
+    async def run(self, prompt_name: str, call, accept=None):
+        """Run ``call(model)`` on the best tier for this prompt.
+
+        ``accept(output)`` may reject a fast-tier result, which counts as an
+        escalation and re-runs the call on the large tier.
+        """
+        if prompt_name not in self.fast_prompts:
+            return await call(None)
+        large = self.pick(prompt_name, self.large)
+        if not self.fast:
+            return await self._timed(prompt_name, large, call)
+
+        fast = self.pick(prompt_name, self.fast, fallback=False, max_rejected=MAX_REJECTED_RATE)
+        if not fast:
+            metrics.incr(f"fast_tier_skipped.{prompt_name}")
+            return await self._timed(prompt_name, large, call)
+        start = time.perf_counter()
+        try:
+            output = await self._timed(prompt_name, fast, call, check=accept)
+        except Exception as e:
+            print(f"Escalating {prompt_name} from {fast} to {large}: {e}")
+            metrics.incr(f"escalations.{prompt_name}")
+            return await self._timed(prompt_name, large, call)
+
+        if large:
+            large_latency = self._stats(prompt_name, large).latency
+            if large_latency is not None:
+                saved = large_latency - (time.perf_counter() - start)
+                metrics.incr("latency_saved_seconds", max(saved, 0))
+        metrics.incr(f"fast_tier_hits.{prompt_name}")
+        return output
+
+    async def _timed(self, prompt_name: str, model, call, check=None):
+        start = time.perf_counter()
+        try:
+            output = await call(model)
+        except Exception:
+            if model:
+                self._stats(prompt_name, model).record(time.perf_counter() - start, "error")
+            raise
+        try:
+            outcome = "ok" if not check or check(output) else "rejected"
+        except Exception:
+            # e.g. extract_json on prose: unusable output, not a failed call
+            outcome = "rejected"
+        if model:
+            self._stats(prompt_name, model).record(time.perf_counter() - start, outcome)
+        if outcome == "rejected":
+            raise Rejected("output rejected")
+        return output
+
+    def report(self) -> list:
+        lines = []
+        for (prompt_name, model), stats in sorted(self.stats.items()):
+            latency = f"{stats.latency:.2f}s" if stats.latency is not None else "n/a"
+            lines.append(f"{prompt_name} on {model}: latency {latency}, errors {stats.error_rate:.0%}, "
+                         f"rejected {stats.rate('rejected'):.0%} ({len(stats.samples)} runs)")
+        return lines
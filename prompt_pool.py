@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+Prompt pool - keeps pre-warmed prompt_worker.py processes around so a prompt
+run does not pay interpreter startup and tool import cost every time.
+
+Run directly to benchmark the pool against plain subprocess spawning:
+
+    python prompt_pool.py --runs 10
+    python prompt_pool.py --runs 3 prompts/router.prompt '{"message": "hi", "prompts": ""}'
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import statistics
+from pathlib import Path
+
+WORKER_SCRIPT = Path(__file__).parent / "prompt_worker.py"
+STREAM_LIMIT = 16 * 1024 * 1024
+
+
+async def run_subprocess(args: list, input_data: dict, env: dict = None) -> tuple:
+    """Run runprompt as a fresh subprocess. Returns (returncode, stdout, stderr)."""
+    proc = await asyncio.create_subprocess_exec(
+        "runprompt", *args,
+        stdin=asyncio.subprocess.PIPE,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        env={**os.environ, **env} if env else None,
+    )
+    stdout, stderr = await proc.communicate(json.dumps(input_data).encode())
+    return proc.returncode, stdout.decode(), stderr.decode()
+
+
+class _Worker:
+    def __init__(self, proc):
+        self.proc = proc
+        self.requests = 0
+        self.rss_kb = 0
+        self.last_used = time.monotonic()
+
+    async def call(self, request: dict) -> dict:
+        self.proc.stdin.write((json.dumps(request) + "\n").encode())
+        await self.proc.stdin.drain()
+        line = await self.proc.stdout.readline()
+        if not line:
+            raise RuntimeError(f"prompt worker {self.proc.pid} exited unexpectedly")
+        return json.loads(line)
+
+    def kill(self):
+        if self.proc.returncode is None:
+            self.proc.kill()
+
+
+class PromptPool:
+    """Pool of pre-warmed runprompt workers that grows and shrinks with load.
+
+    Workers are recycled after ``max_requests`` runs or once their peak RSS
+    passes ``max_rss_mb``. Idle workers above ``min_workers`` are reaped
+    after ``idle_timeout`` seconds. When all ``max_workers`` are busy a run
+    gets a plain subprocess instead of waiting behind long prompt runs.
+    """
+
+    def __init__(self, tool_path: str = "./tools", min_workers: int = 1, max_workers: int = 4,
+                 max_requests: int = 50, max_rss_mb: int = 400, idle_timeout: int = 300):
+        self.tool_path = tool_path
+        self.min_workers = min_workers
+        self.max_workers = max(max_workers, min_workers, 1)
+        self.max_requests = max_requests
+        self.max_rss_kb = max_rss_mb * 1024
+        self.idle_timeout = idle_timeout
+        self._idle = []
+        self._count = 0
+        self._lock = asyncio.Lock()
+        self._reaper = None
+        self._closed = False
+
+    @classmethod
+    def from_config(cls, config: dict, tool_path: str = "./tools"):
+        pool_config = config.get("pool", {})
+        return cls(
+            tool_path=tool_path,
+            min_workers=pool_config.get("min_workers", 1),
+            max_workers=pool_config.get("max_workers", 4),
+            max_requests=pool_config.get("max_requests", 50),
+            max_rss_mb=pool_config.get("max_rss_mb", 400),
+            idle_timeout=pool_config.get("idle_timeout", 300),
+        )
+
+    async def start(self):
+        for _ in range(self.min_workers):
+            async with self._lock:
+                self._count += 1
+            await self._add_idle(await self._spawn_or_release())
+        self._reaper = asyncio.create_task(self._reap_idle())
+
+    async def close(self):
+        """Stop idle workers now; busy ones are stopped when their run finishes."""
+        if self._reaper:
+            self._reaper.cancel()
+        async with self._lock:
+            self._closed = True
+            for worker in self._idle:
+                worker.kill()
+            self._idle.clear()
+
+    async def run(self, args: list, input_data: dict, env: dict = None) -> tuple:
+        """Run runprompt on a warm worker. Returns (returncode, stdout, stderr)."""
+        worker = await self._acquire()
+        if worker is None:
+            return await run_subprocess(args, input_data, env)
+        try:
+            result = await worker.call({"args": args, "input": input_data, "env": env or {}})
+        except BaseException:
+            worker.kill()
+            await self._retire(worker)
+            raise
+        worker.requests += 1
+        worker.rss_kb = result.get("rss_kb", 0)
+        await self._release(worker)
+        return result["returncode"], result["stdout"], result["stderr"]
+
+    async def _spawn(self) -> _Worker:
+        proc = await asyncio.create_subprocess_exec(
+            sys.executable, str(WORKER_SCRIPT), "--tool-path", self.tool_path,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            limit=STREAM_LIMIT,
+        )
+        worker = _Worker(proc)
+        ready = json.loads(await proc.stdout.readline() or b"{}")
+        if not ready.get("ready"):
+            worker.kill()
+            raise RuntimeError(f"prompt worker failed to start: {ready.get('error', 'no ready signal')}")
+        return worker
+
+    async def _spawn_or_release(self) -> _Worker:
+        """Spawn a worker for a slot already counted in ``_count``."""
+        try:
+            return await self._spawn()
+        except Exception:
+            async with self._lock:
+                self._count -= 1
+            raise
+
+    async def _add_idle(self, worker: _Worker):
+        async with self._lock:
+            if self._closed:
+                worker.kill()
+                self._count -= 1
+                return
+            worker.last_used = time.monotonic()
+            self._idle.append(worker)
+
+    async def _acquire(self):
+        """An idle or newly spawned worker, or None when the pool is saturated."""
+        async with self._lock:
+            if self._closed:
+                raise RuntimeError("prompt pool is closed")
+            if self._idle:
+                return self._idle.pop()
+            if self._count >= self.max_workers:
+                return None
+            self._count += 1
+        return await self._spawn_or_release()
+
+    async def _release(self, worker: _Worker):
+        if self._closed:
+            worker.kill()
+            await self._retire(worker)
+            return
+        if worker.requests >= self.max_requests or worker.rss_kb >= self.max_rss_kb:
+            print(f"Recycling prompt worker {worker.proc.pid} "
+                  f"({worker.requests} requests, {worker.rss_kb // 1024} MB)")
+            worker.kill()
+            await self._retire(worker)
+            return
+        await self._add_idle(worker)
+
+    async def _retire(self, worker: _Worker):
+        async with self._lock:
+            self._count -= 1
+            replace = not self._closed and self._count < self.min_workers
+            if replace:
+                self._count += 1
+        if replace:
+            asyncio.create_task(self._replace())
+
+    async def _replace(self):
+        try:
+            await self._add_idle(await self._spawn_or_release())
+        except Exception as e:
+            print(f"Warning: failed to replace prompt worker: {e}")
+
+    async def _reap_idle(self):
+        while True:
+            await asyncio.sleep(max(self.idle_timeout / 4, 1))
+            now = time.monotonic()
+            async with self._lock:
+                for worker in sorted(self._idle, key=lambda w: w.last_used):
+                    if self._count <= self.min_workers:
+                        break
+                    if now - worker.last_used >= self.idle_timeout:
+                        self._idle.remove(worker)
+                        self._count -= 1
+                        worker.kill()
+
+
+async def benchmark(args: list, input_data: dict, runs: int):
+    """Time the subprocess path against the warm pool for the same runprompt call."""
+    def report(label, timings):
+        print(f"{label:<12} mean {statistics.mean(timings) * 1000:8.1f} ms   "
+              f"p50 {statistics.median(timings) * 1000:8.1f} ms   "
+              f"max {max(timings) * 1000:8.1f} ms")
+
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        await run_subprocess(args, input_data)
+        timings.append(time.perf_counter() - start)
+    report("subprocess", timings)
+
+    pool = PromptPool(min_workers=1, max_workers=1)
+    start = time.perf_counter()
+    await pool.start()
+    print(f"{'pool start':<12} {(time.perf_counter() - start) * 1000:8.1f} ms")
+
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        await pool.run(args, input_data)
+        timings.append(time.perf_counter() - start)
+    report("pool", timings)
+    await pool.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark runprompt subprocess vs warm pool dispatch")
+    parser.add_argument("prompt_file", nargs="?", help="prompt to run (default: runprompt --help only)")
+    parser.add_argument("input", nargs="?", default="{}", help="JSON input for the prompt")
+    parser.add_argument("--runs", type=int, default=10)
+    options = parser.parse_args()
+
+    if options.prompt_file:
+        args = ["--safe-yes", "--tool-path", "./tools", options.prompt_file]
+    else:
+        args = ["--help"]
+    asyncio.run(benchmark(args, json.loads(options.input), options.runs))
+
+
+if __name__ == "__main__":
+    main()
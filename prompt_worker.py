@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Prompt worker - a pre-warmed runprompt process driven over stdin/stdout.
+
+Started by prompt_pool.py. Each request is one line of JSON on stdin and each
+reply is one line of JSON on the original stdout. Tool modules are imported
+once at startup, so later runs skip interpreter startup and tool import cost.
+"""
+
+import io
+import os
+import sys
+import json
+import runpy
+import shutil
+import resource
+import argparse
+import traceback
+import importlib
+import importlib.util
+from pathlib import Path
+
+from tool_manifest import load_manifest
+
+RUNPROMPT = shutil.which("runprompt")
+
+
+def warm_tools(tool_path: str):
+    """Import the tool modules prompts use, plus the dependencies they defer.
+
+    Tools import heavy dependencies inside the tool functions so a cold
+    runprompt only pays for what a prompt actually calls; a warm worker
+    pre-imports them once so those calls are a sys.modules lookup.
+    """
+    manifest = load_manifest(tool_path)
+    used = {module for modules in manifest["prompts"].values() for module in modules}
+    for module in sorted(used):
+        entry = manifest["modules"][module]
+        for dependency in entry["lazy_imports"]:
+            try:
+                importlib.import_module(dependency)
+            except Exception as e:
+                print(f"Warning: failed to warm {dependency} for {module}: {e}", file=sys.stderr)
+        module_file = Path(tool_path) / entry["file"]
+        try:
+            spec = importlib.util.spec_from_file_location(module, module_file)
+            spec.loader.exec_module(importlib.util.module_from_spec(spec))
+        except Exception as e:
+            print(f"Warning: failed to warm {module_file}: {e}", file=sys.stderr)
+
+
+def run_request(args: list, input_data: dict, env: dict) -> dict:
+    """Run runprompt in-process with the given CLI args and stdin payload."""
+    stdin = io.TextIOWrapper(io.BytesIO(json.dumps(input_data).encode()), encoding="utf-8")
+    stdout = io.TextIOWrapper(io.BytesIO(), encoding="utf-8")
+    stderr = io.TextIOWrapper(io.BytesIO(), encoding="utf-8")
+
+    saved = sys.argv, sys.stdin, sys.stdout, sys.stderr
+    saved_env = os.environ.copy()
+    sys.argv = [RUNPROMPT, *args]
+    sys.stdin, sys.stdout, sys.stderr = stdin, stdout, stderr
+    os.environ.update(env)
+
+    returncode = 0
+    try:
+        runpy.run_path(RUNPROMPT, run_name="__main__")
+    except SystemExit as e:
+        if isinstance(e.code, int):
+            returncode = e.code
+        elif e.code is not None:
+            stderr.write(str(e.code))
+            returncode = 1
+    except BaseException:
+        stderr.write(traceback.format_exc())
+        returncode = 1
+    finally:
+        sys.argv, sys.stdin, sys.stdout, sys.stderr = saved
+        os.environ.clear()
+        os.environ.update(saved_env)
+
+    stdout.flush()
+    stderr.flush()
+    return {
+        "returncode": returncode,
+        "stdout": stdout.buffer.getvalue().decode(errors="replace"),
+        "stderr": stderr.buffer.getvalue().decode(errors="replace"),
+        "rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tool-path", default="./tools")
+    options = parser.parse_args()
+
+    # Keep the framing channel private: anything else writing to fd 1
+    # (tools, child processes) ends up on stderr instead.
+    reply = os.fdopen(os.dup(1), "w", encoding="utf-8")
+    os.dup2(2, 1)
+
+    if not RUNPROMPT:
+        print(json.dumps({"ready": False, "error": "runprompt not found on PATH"}), file=reply, flush=True)
+        return
+
+    warm_tools(options.tool_path)
+    print(json.dumps({"ready": True}), file=reply, flush=True)
+
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        request = json.loads(line)
+        result = run_request(request["args"], request.get("input", {}), request.get("env", {}))
+        print(json.dumps(result), file=reply, flush=True)
+
+
+if __name__ == "__main__":
+    main()
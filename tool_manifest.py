@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Tool manifest - scans tools/ once with ast (no imports) and records every
+tool's name, docstring, parameter schema and .safe flag, plus which
+dependencies each module imports eagerly and which only inside tool calls.
+prompt_worker.py uses the per-prompt module lists and lazy imports; the
+docstrings, parameter schemas and .safe flags are informational only.
+
+The manifest is rebuilt automatically when a tool or prompt file changes.
+Run directly to rebuild it, or with --measure to report per-prompt import
+times for lazy (module only) vs eager (module + all its dependencies):
+
+    python tool_manifest.py
+    python tool_manifest.py --measure
+"""
+
+import os
+import ast
+import sys
+import json
+import time
+import argparse
+import subprocess
+from pathlib import Path
+
+import yaml
+
+TOOL_PATH = Path(__file__).parent / "tools"
+PROMPTS_DIR = Path(__file__).parent / "prompts"
+MANIFEST_NAME = "manifest.json"
+
+JSON_TYPES = {
+    "str": "string",
+    "int": "integer",
+    "float": "number",
+    "bool": "boolean",
+    "list": "array",
+    "List": "array",
+    "dict": "object",
+    "Dict": "object",
+}
+
+
+def _import_roots(nodes) -> list:
+    roots = set()
+    for node in nodes:
+        if isinstance(node, ast.Import):
+            roots.update(alias.name.split(".")[0] for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            roots.add(node.module.split(".")[0])
+    return sorted(roots)
+
+
+def _param_schema(func: ast.FunctionDef) -> list:
+    args = func.args.args
+    defaults = [None] * (len(args) - len(func.args.defaults)) + func.args.defaults
+    params = []
+    for arg, default in zip(args, defaults):
+        annotation = ast.unparse(arg.annotation) if arg.annotation else None
+        base = annotation.split("[")[0] if annotation else None
+        param = {
+            "name": arg.arg,
+            "type": JSON_TYPES.get(base, "string"),
+            "required": default is None,
+        }
+        if default is not None:
+            try:
+                param["default"] = ast.literal_eval(default)
+            except ValueError:
+                param["default"] = ast.unparse(default)
+        params.append(param)
+    return params
+
+
+def scan_module(module_file: Path) -> dict:
+    """Describe one tool module without importing it."""
+    tree = ast.parse(module_file.read_text(), filename=str(module_file))
+
+    safe = set()
+    for node in tree.body:
+        if (isinstance(node, ast.Assign) and len(node.targets) == 1
+                and isinstance(node.targets[0], ast.Attribute)
+                and node.targets[0].attr == "safe"
+                and isinstance(node.targets[0].value, ast.Name)
+                and isinstance(node.value, ast.Constant) and node.value.value is True):
+            safe.add(node.targets[0].value.id)
+
+    functions = {}
+    lazy = set()
+    for node in tree.body:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            lazy.update(_import_roots(ast.walk(node)))
+            if node.name.startswith("_"):
+                continue
+            functions[node.name] = {
+                "doc": ast.get_docstring(node) or "",
+                "params": _param_schema(node),
+                "safe": node.name in safe,
+            }
+
+    eager = _import_roots(tree.body)
+    # Standard library and sibling helpers (_compact, _jobs, ...) are not dependencies
+    internal = set(sys.stdlib_module_names) | {path.stem for path in module_file.parent.glob("*.py")}
+    return {
+        "file": module_file.name,
+        "mtime": module_file.stat().st_mtime,
+        "functions": functions,
+        "eager_imports": [name for name in eager if name not in internal],
+        "lazy_imports": sorted(name for name in lazy - set(eager) if name not in internal),
+    }
+
+
+def prompt_tool_specs(prompt_file: Path) -> list:
+    """Return the ``tools:`` entries from a prompt's YAML frontmatter."""
+    parts = prompt_file.read_text().split("---")
+    if len(parts) < 3:
+        return []
+    config = yaml.safe_load(parts[1]) or {}
+    return config.get("tools", []) or []
+
+
+def resolve_specs(manifest: dict, specs: list) -> dict:
+    """Expand ``module.func`` / ``module.*`` specs to {module: [functions]}."""
+    resolved = {}
+    for spec in specs:
+        module, _, func = spec.partition(".")
+        entry = manifest["modules"].get(module)
+        if not entry:
+            continue
+        names = list(entry["functions"]) if func == "*" else [func]
+        resolved.setdefault(module, []).extend(n for n in names if n in entry["functions"])
+    return resolved
+
+
+def build_manifest(tool_path: Path = TOOL_PATH, prompts_dir: Path = PROMPTS_DIR) -> dict:
+    modules = {}
+    for module_file in sorted(tool_path.glob("*.py")):
+        if module_file.name.startswith("_"):
+            continue
+        try:
+            modules[module_file.stem] = scan_module(module_file)
+        except SyntaxError as e:
+            print(f"Warning: failed to scan {module_file}: {e}")
+
+    manifest = {"built": time.time(), "modules": modules, "prompts": {}}
+    for prompt_file in sorted(prompts_dir.glob("*.prompt")):
+        try:
+            specs = prompt_tool_specs(prompt_file)
+        except Exception as e:
+            print(f"Warning: failed to read {prompt_file}: {e}")
+            continue
+        manifest["prompts"][prompt_file.stem] = resolve_specs(manifest, specs)
+
+    # Workers may rebuild concurrently; replace atomically so readers never see a partial file.
+    tmp = tool_path / f".{MANIFEST_NAME}.{os.getpid()}"
+    tmp.write_text(json.dumps(manifest, indent=2))
+    os.replace(tmp, tool_path / MANIFEST_NAME)
+    return manifest
+
+
+def load_manifest(tool_path: Path = TOOL_PATH, prompts_dir: Path = PROMPTS_DIR) -> dict:
+    """Load the manifest, rebuilding it if any tool or prompt file is newer."""
+    tool_path, prompts_dir = Path(tool_path), Path(prompts_dir)
+    manifest_file = tool_path / MANIFEST_NAME
+    sources = [*tool_path.glob("*.py"), *prompts_dir.glob("*.prompt")]
+    if manifest_file.exists():
+        built = manifest_file.stat().st_mtime
+        if all(source.stat().st_mtime <= built for source in sources):
+            return json.loads(manifest_file.read_text())
+    return build_manifest(tool_path, prompts_dir)
+
+
+def _time_imports(module_files: list, dependencies: list) -> float:
+    """Import modules (and optionally dependencies) in a fresh interpreter, return seconds."""
+    script = (
+        "import time, importlib, importlib.util, sys\n"
+        "start = time.perf_counter()\n"
+        f"for name in {dependencies!r}:\n"
+        "    try: importlib.import_module(name)\n"
+        "    except ImportError: pass\n"
+        f"for path in {[str(f) for f in module_files]!r}:\n"
+        "    spec = importlib.util.spec_from_file_location('tool', path)\n"
+        "    try: spec.loader.exec_module(importlib.util.module_from_spec(spec))\n"
+        "    except ImportError: pass\n"
+        "print(time.perf_counter() - start)\n"
+    )
+    result = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True)
+    return float(result.stdout.strip() or 0)
+
+
+def measure(manifest: dict, tool_path: Path = TOOL_PATH):
+    """Print per-prompt import time with lazy vs eager tool dependencies."""
+    print(f"{'prompt':<20} {'lazy':>10} {'eager':>10} {'saved':>10}")
+    for prompt, modules in manifest["prompts"].items():
+        files = [tool_path / manifest["modules"][m]["file"] for m in modules]
+        deps = sorted({d for m in modules for d in manifest["modules"][m]["lazy_imports"]})
+        lazy = _time_imports(files, [])
+        eager = _time_imports(files, deps)
+        print(f"{prompt:<20} {lazy * 1000:8.1f}ms {eager * 1000:8.1f}ms {(eager - lazy) * 1000:8.1f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the tools/ manifest")
+    parser.add_argument("--measure", action="store_true", help="report per-prompt import savings")
+    options = parser.parse_args()
+
+    manifest = build_manifest()
+    count = sum(len(m["functions"]) for m in manifest["modules"].values())
+    print(f"Wrote {TOOL_PATH / MANIFEST_NAME}: {len(manifest['modules'])} modules, {count} tools")
+    if options.measure:
+        measure(manifest)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+"""
+Output compaction for tool results fed back to the LLM.
+
+Wrap a tool with @compact and its text result has repeated lines collapsed
+and is trimmed to a per-tool token budget before runprompt sends it to the
+model. Tools that return web pages use @compact(strip=True) to also drop
+HTML tags and markdown boilerplate; other output (shell, calendar) is left
+as is, since "<none>" or "a < b" there is content, not markup. Structured
+results (dicts, lists) are passed through unless their JSON is over budget,
+in which case the truncated JSON text is returned instead.
+
+When the saving is worth the footer, the full result is kept in RESULTS_DIR
+and can be read back with results.get_result(handle); stored results expire
+after RESULTS_TTL. Savings per tool are appended to stats.jsonl, which keeps
+its newest entries once it passes STATS_MAX_BYTES; run this file directly to
+print a report.
+"""
+
+import re
+import json
+import time
+import hashlib
+import tomllib
+import functools
+from html import unescape
+from pathlib import Path
+
+RESULTS_DIR = Path("/tmp/dotprompt_results")
+STATS_FILE = RESULTS_DIR / "stats.jsonl"
+RESULTS_TTL = 24 * 3600
+STATS_MAX_BYTES = 1024 * 1024
+CONFIG_PATH = Path(__file__).parent.parent / "config.toml"
+DEFAULT_BUDGET = 2000
+CHARS_PER_TOKEN = 4
+
+_BLOCK_TAGS = re.compile(r"<(script|style|nav|header|footer|noscript)\b.*?</\1>", re.S | re.I)
+_TAGS = re.compile(r"<[^>]+>")
+_MD_IMAGE = re.compile(r"!\[[^\]]*\]\([^)]*\)")
+_MD_LINK = re.compile(r"\[([^\]]*)\]\([^)]*\)")
+_LINK_ONLY = re.compile(r"^[\s*\-|•·>]*$")
+
+
+def estimate_tokens(text: str) -> int:
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def _load_config():
+    try:
+        with open(CONFIG_PATH, "rb") as f:
+            return tomllib.load(f).get("compaction", {})
+    except (OSError, tomllib.TOMLDecodeError):
+        return {}
+
+
+def budget_for(tool: str) -> int:
+    config = _load_config()
+    return config.get("budgets", {}).get(tool, config.get("default_budget", DEFAULT_BUDGET))
+
+
+def strip_boilerplate(text: str) -> str:
+    """Drop HTML markup, markdown images and link-only (navigation) lines."""
+    if "<" in text and _TAGS.search(text):
+        text = _BLOCK_TAGS.sub("", text)
+        text = unescape(_TAGS.sub("", text))
+    text = _MD_IMAGE.sub("", text)
+
+    lines = []
+    for line in text.splitlines():
+        if _MD_LINK.search(line) and _LINK_ONLY.match(_MD_LINK.sub("", line)):
+            continue
+        lines.append(line.rstrip())
+    return "\n".join(lines)
+
+
+def dedupe_lines(text: str) -> str:
+    """Collapse runs of identical lines and drop later repeats of long lines."""
+    lines = []
+    seen = set()
+    previous, repeats = None, 0
+    for line in text.splitlines():
+        if line == previous and line.strip():
+            repeats += 1
+            continue
+        if repeats:
+            lines.append(f"(previous line repeated {repeats} more times)")
+        previous, repeats = line, 0
+        if len(line.strip()) > 40:
+            if line in seen:
+                continue
+            seen.add(line)
+        if not line.strip() and lines and not lines[-1].strip():
+            continue
+        lines.append(line)
+    if repeats:
+        lines.append(f"(previous line repeated {repeats} more times)")
+    return "\n".join(lines).strip()
+
+
+_last_prune = 0.0
+
+
+def _handle(text: str) -> str:
+    return hashlib.sha1(text.encode()).hexdigest()[:12]
+
+
+def _prune():
+    """Drop stored results older than RESULTS_TTL, at most once a minute."""
+    global _last_prune
+    now = time.time()
+    if now - _last_prune < 60:
+        return
+    _last_prune = now
+    for path in RESULTS_DIR.glob("*.txt"):
+        try:
+            if now - path.stat().st_mtime > RESULTS_TTL:
+                path.unlink()
+        except OSError:
+            pass
+
+
+def store_result(text: str) -> str:
+    """Keep the full result on disk and return its handle."""
+    RESULTS_DIR.mkdir(exist_ok=True)
+    _prune()
+    handle = _handle(text)
+    (RESULTS_DIR / f"{handle}.txt").write_text(text)
+    return handle
+
+
+def _footer(handle: str) -> str:
+    return f"\n\n[compacted; full result: results.get_result(handle=\"{handle}\")]"
+
+
+def _truncate(text: str, budget: int, handle: str) -> str:
+    limit = budget * CHARS_PER_TOKEN
+    head = text[: limit * 2 // 3]
+    tail = text[-(limit // 3):]
+    omitted = len(text) - len(head) - len(tail)
+    return (
+        f"{head}\n\n[... {omitted} characters omitted. Full result: "
+        f"results.get_result(handle=\"{handle}\") ...]\n\n{tail}"
+    )
+
+
+def compact_text(tool: str, text: str, budget: int = None, strip: bool = False) -> str:
+    budget = budget or budget_for(tool)
+    compacted = text
+    if not text.lstrip().startswith(("{", "[")):
+        compacted = dedupe_lines(strip_boilerplate(text) if strip else text)
+    if estimate_tokens(compacted) > budget:
+        compacted = _truncate(compacted, budget, store_result(text))
+    elif len(compacted) + len(_footer(_handle(text))) < len(text):
+        compacted += _footer(store_result(text))
+    else:
+        compacted = text
+    _record(tool, text, compacted)
+    return compacted
+
+
+def _record(tool: str, raw: str, sent: str):
+    try:
+        RESULTS_DIR.mkdir(exist_ok=True)
+        if STATS_FILE.exists() and STATS_FILE.stat().st_size > STATS_MAX_BYTES:
+            lines = STATS_FILE.read_text().splitlines(keepends=True)
+            STATS_FILE.write_text("".join(lines[len(lines) // 2:]))
+        with open(STATS_FILE, "a") as f:
+            f.write(json.dumps({
+                "time": time.time(),
+                "tool": tool,
+                "raw_tokens": estimate_tokens(raw),
+                "sent_tokens": estimate_tokens(sent),
+            }) + "\n")
+    except OSError:
+        pass
+
+
+def compact(func=None, *, strip: bool = False):
+    """Decorator: compact a tool's result before it reaches the LLM.
+
+    Use as ``@compact``, or ``@compact(strip=True)`` for tools returning
+    HTML/markdown pages whose markup should be stripped.
+    """
+    if func is None:
+        return functools.partial(compact, strip=strip)
+    tool = f"{Path(func.__code__.co_filename).stem}.{func.__name__}"
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        result = func(*args, **kwargs)
+        if isinstance(result, str):
+            return compact_text(tool, result, strip=strip)
+        try:
+            text = json.dumps(result, ensure_ascii=False)
+        except (TypeError, ValueError):
+            return result
+        compacted = compact_text(tool, text)
+        return result if compacted == text else compacted
+
+    return wrapper
+
+
+def report() -> dict:
+    """Aggregate stats.jsonl into per-tool call counts and token savings."""
+    totals = {}
+    if not STATS_FILE.exists():
+        return totals
+    for line in STATS_FILE.read_text().splitlines():
+        try:
+            entry = json.loads(line)
+        except json.JSONDecodeError:
+            continue
+        tool = totals.setdefault(entry["tool"], {"calls": 0, "raw_tokens": 0, "sent_tokens": 0})
+        tool["calls"] += 1
+        tool["raw_tokens"] += entry["raw_tokens"]
+        tool["sent_tokens"] += entry["sent_tokens"]
+    return totals
+
+
+if __name__ == "__main__":
+    print(f"{'tool':<32} {'calls':>6} {'raw':>9} {'sent':>9} {'saved':>7}")
+    for name, t in sorted(report().items()):
+        saved = 1 - t["sent_tokens"] / t["raw_tokens"] if t["raw_tokens"] else 0
+        print(f"{name:<32} {t['calls']:>6} {t['raw_tokens']:>9} {t['sent_tokens']:>9} {saved:>6.0%}")
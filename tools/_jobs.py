@@ -0,0 +1,141 @@
+"""
+Durable job queue for long-running shell commands, backed by SQLite.
+
+Tools (bash.run_command) enqueue jobs and return immediately; the bot's
+JobRunner (job_runner.py) claims and runs them, appends their output to a
+per-job log file and reports completion to the chat that started them.
+Both sides share this module, so it only uses the standard library.
+"""
+
+import time
+import sqlite3
+import tomllib
+from pathlib import Path
+from contextlib import closing, contextmanager
+
+CONFIG_PATH = Path(__file__).parent.parent / "config.toml"
+DEFAULT_DIR = "~/.local/state/dotprompt_bot"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    command TEXT NOT NULL,
+    timeout INTEGER,
+    chat_id INTEGER,
+    status TEXT NOT NULL DEFAULT 'queued',
+    exit_code INTEGER,
+    created REAL NOT NULL,
+    started REAL,
+    finished REAL,
+    log_path TEXT,
+    notified INTEGER NOT NULL DEFAULT 0
+)
+"""
+
+
+def _load_config():
+    try:
+        with open(CONFIG_PATH, "rb") as f:
+            return tomllib.load(f).get("jobs", {})
+    except (OSError, tomllib.TOMLDecodeError):
+        return {}
+
+
+def jobs_dir() -> Path:
+    path = Path(_load_config().get("dir", DEFAULT_DIR)).expanduser()
+    (path / "logs").mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def background_after() -> int:
+    """Commands with a timeout at or above this many seconds run as jobs."""
+    return _load_config().get("background_after", 60)
+
+
+@contextmanager
+def connect():
+    """Autocommit connection to the jobs database, closed on exit."""
+    with closing(sqlite3.connect(jobs_dir() / "jobs.db", timeout=10, isolation_level=None)) as conn:
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(SCHEMA)
+        yield conn
+
+
+def enqueue(name: str, command: str, timeout: int = None, chat_id: int = None) -> int:
+    with connect() as conn:
+        cursor = conn.execute(
+            "INSERT INTO jobs (name, command, timeout, chat_id, created) VALUES (?, ?, ?, ?, ?)",
+            (name, command, timeout, chat_id, time.time()),
+        )
+        job_id = cursor.lastrowid
+        conn.execute("UPDATE jobs SET log_path = ? WHERE id = ?",
+                     (str(jobs_dir() / "logs" / f"{job_id}.log"), job_id))
+    return job_id
+
+
+def get(job_id: int):
+    with connect() as conn:
+        return conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+
+
+def claim_next():
+    """Atomically move the oldest queued job to running and return it."""
+    with connect() as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        row = conn.execute(
+            "SELECT * FROM jobs WHERE status = 'queued' ORDER BY id LIMIT 1"
+        ).fetchone()
+        if row:
+            conn.execute("UPDATE jobs SET status = 'running', started = ? WHERE id = ?",
+                         (time.time(), row["id"]))
+        conn.execute("COMMIT")
+    return row
+
+
+def finish(job_id: int, status: str, exit_code: int = None):
+    with connect() as conn:
+        conn.execute("UPDATE jobs SET status = ?, exit_code = ?, finished = ? WHERE id = ?",
+                     (status, exit_code, time.time(), job_id))
+
+
+def interrupt_running() -> list:
+    """Mark jobs left running by a previous bot process as interrupted."""
+    with connect() as conn:
+        rows = conn.execute("SELECT id FROM jobs WHERE status = 'running'").fetchall()
+        conn.execute("UPDATE jobs SET status = 'interrupted', finished = ? WHERE status = 'running'",
+                     (time.time(),))
+    return [row["id"] for row in rows]
+
+
+def unnotified() -> list:
+    with connect() as conn:
+        return conn.execute(
+            "SELECT * FROM jobs WHERE notified = 0 AND status IN ('done', 'failed', 'interrupted') ORDER BY id"
+        ).fetchall()
+
+
+def mark_notified(job_id: int):
+    with connect() as conn:
+        conn.execute("UPDATE jobs SET notified = 1 WHERE id = ?", (job_id,))
+
+
+def tail(log_path: str, lines: int = 20) -> str:
+    try:
+        with open(log_path, "r", errors="replace") as f:
+            return "".join(f.readlines()[-lines:]).strip()
+    except OSError:
+        return ""
+
+
+def describe(row, lines: int = 20) -> str:
+    """Human-readable status line plus the end of the job's log."""
+    status = row["status"]
+    if row["exit_code"] is not None:
+        status += f" (exit {row['exit_code']})"
+    if row["started"]:
+        end = row["finished"] or time.time()
+        status += f", ran {end - row['started']:.0f}s"
+    output = tail(row["log_path"], lines)
+    return f"Job #{row['id']} {row['name']}: {status}" + (f"\n{output}" if output else "")
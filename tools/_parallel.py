@@ -0,0 +1,72 @@
+"""
+Run independent tool calls concurrently.
+
+runprompt executes the model's tool calls one at a time, so tools that
+always need several independent results (see today.py) fan them out here.
+Calls run on a thread pool (the tools are I/O-bound), and ``.concurrency = N``,
+declared next to ``.safe``, caps how many calls of that tool run at once.
+"""
+
+import inspect
+import threading
+import importlib.util
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+TOOL_PATH = Path(__file__).parent
+MAX_THREADS = 8
+
+_modules = {}
+_limits = {}
+_lock = threading.Lock()
+_threads = None
+
+
+def load_tool(module: str):
+    """Import a sibling tool module by path (tools/calendar.py would shadow the stdlib by name)."""
+    with _lock:
+        if module not in _modules:
+            spec = importlib.util.spec_from_file_location(f"_tool_{module}", TOOL_PATH / f"{module}.py")
+            loaded = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(loaded)
+            _modules[module] = loaded
+        return _modules[module]
+
+
+def _source(func) -> tuple:
+    """(file, name) of the undecorated tool function, e.g. behind @compact; keys its limit."""
+    original = inspect.unwrap(func)
+    return original.__code__.co_filename, original.__name__
+
+
+def _limit_for(func):
+    key = _source(func)
+    with _lock:
+        if key not in _limits:
+            _limits[key] = threading.BoundedSemaphore(getattr(func, "concurrency", MAX_THREADS))
+        return _limits[key]
+
+
+def _run_one(func, args: tuple, kwargs: dict):
+    with _limit_for(func):
+        return func(*args, **kwargs)
+
+
+def run_parallel(calls: list) -> list:
+    """Run ``[(func, args, kwargs), ...]`` concurrently; results come back in call order.
+
+    Like asyncio.gather(return_exceptions=True), a failing call yields its
+    exception instead of cancelling the others.
+    """
+    global _threads
+    with _lock:
+        if _threads is None:
+            _threads = ThreadPoolExecutor(max_workers=MAX_THREADS)
+    futures = [_threads.submit(_run_one, func, args, kwargs) for func, args, kwargs in calls]
+    results = []
+    for future in futures:
+        try:
+            results.append(future.result())
+        except Exception as e:
+            results.append(e)
+    return results
@@ -8,7 +8,6 @@ import os
 import time
 import json
 import tomllib
-import httpx
 from pathlib import Path
 
 ASK_DIR = Path("/tmp/dotprompt_ask")
@@ -33,6 +32,11 @@ def ask(question):
     str
         The user's answer.
     """
+    if os.getenv("DOTPROMPT_UNATTENDED"):
+        return "(unattended run: nobody can answer now; make your best guess and mark it with (?))"
+
+    import httpx
+
     config = _load_config()
     token = os.getenv("TELEGRAM_TOKEN")
     authorized_users = config["telegram"]["authorized_users"]
@@ -1,7 +1,13 @@
+import os
+import sys
 import subprocess
 import tomllib
 from pathlib import Path
 
+sys.path.append(str(Path(__file__).parent))
+from _compact import compact
+import _jobs
+
 CONFIG_PATH = Path(__file__).parent.parent / "config.toml"
 
 
@@ -11,6 +17,18 @@ def _load_commands():
     return config.get("commands", [])
 
 
+def _enqueue_command(cmd_config):
+    chat_id = os.getenv("DOTPROMPT_CHAT_ID")
+    job_id = _jobs.enqueue(
+        cmd_config["name"],
+        cmd_config["command"],
+        timeout=cmd_config.get("timeout", 120),
+        chat_id=int(chat_id) if chat_id else None,
+    )
+    return (f"Started job #{job_id} ({cmd_config['name']}) in the background. "
+            f"The user will be notified when it finishes; check it with job_status({job_id}).")
+
+
 def _run_command(cmd_config):
     result = subprocess.run(
         cmd_config["command"],
@@ -25,6 +43,7 @@ def _run_command(cmd_config):
     return output if output else "Done (no output)"
 
 
+@compact
 def run_command(name: str):
     """Run a named command from config.toml.
 
@@ -40,6 +59,9 @@ def run_command(name: str):
     commands = _load_commands()
     for cmd in commands:
         if cmd["name"] == name:
+            # Only an explicit long timeout opts in, not the 120s default
+            if cmd.get("background", cmd.get("timeout", 0) >= _jobs.background_after()):
+                return _enqueue_command(cmd)
             return _run_command(cmd)
     available = ", ".join(c["name"] for c in commands)
     return f"Unknown command '{name}'. Available: {available}"
@@ -60,4 +82,27 @@ def list_commands():
     return "\n".join(lines)
 
 
+@compact
+def job_status(job_id: int):
+    """Check on a background job started by run_command.
+
+    Parameters
+    ----------
+    job_id : int
+        The job number returned by run_command.
+    Returns
+    -------
+    str
+        The job's status (queued, running, done, failed, interrupted) and the end of its output.
+    """
+    try:
+        row = _jobs.get(int(job_id))
+    except ValueError:
+        return f"Invalid job number '{job_id}'."
+    if not row:
+        return f"No job #{job_id}."
+    return _jobs.describe(row)
+
+
 list_commands.safe = True
+job_status.safe = True
@@ -1,6 +1,12 @@
 # bash_help.py
+import sys
 import subprocess
+from pathlib import Path
 
+sys.path.append(str(Path(__file__).parent))
+from _compact import compact
+
+@compact
 def tldr(command: str):
     """Get concise command-line help and examples using tldr.
     
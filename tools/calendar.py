@@ -1,6 +1,12 @@
+import sys
 import subprocess
+from pathlib import Path
 
+sys.path.append(str(Path(__file__).parent))
+from _compact import compact
 
+
+@compact
 def get_today_events() -> str:
     """
     Return today's Google Calendar events using gog cli.
@@ -16,8 +22,10 @@ def get_today_events() -> str:
 
 
 get_today_events.safe = True
+get_today_events.concurrency = 2
 
 
+@compact
 def get_tomorrow_events() -> str:
     """
     Return tomorrow's Google Calendar events using gog cli.
@@ -35,6 +43,7 @@ def get_tomorrow_events() -> str:
 get_tomorrow_events.safe = True
 
 
+@compact
 def get_week_events() -> str:
     """
     Return this week's Google Calendar events using gog cli.
@@ -3,10 +3,14 @@
 Find Tool - Search the internet using searx.osmosis.page and keep.osmosis.page
 """
 
-import requests
-import json
+import sys
+from pathlib import Path
 from typing import List, Dict, Optional
 
+sys.path.append(str(Path(__file__).parent))
+from _compact import compact
+
+@compact
 def search_searx(query: str, limit: int = 5) -> List[Dict]:
     """
     Search using searx.osmosis.page
@@ -46,6 +50,7 @@ def search_searx(query: str, limit: int = 5) -> List[Dict]:
 
 search_searx.safe = True
 
+@compact
 def search_keep(query: str, limit: int = 5) -> List[Dict]:
     """
     Search using keep.osmosis.page (bookmark search)
@@ -87,6 +92,7 @@ def search_keep(query: str, limit: int = 5) -> List[Dict]:
 
 search_keep.safe = True
 
+@compact
 def web_search(query: str, sources: List[str] = ["searx", "keep"], limit: int = 5) -> Dict:
     """
     Perform a comprehensive web search using multiple sources
@@ -106,11 +112,12 @@ def web_search(query: str, sources: List[str] = ["searx", "keep"], limit: int =
     }
     
     if "searx" in sources:
-        searx_results = search_searx(query, limit)
+        # Uncompacted lists: web_search compacts the combined result once
+        searx_results = search_searx.__wrapped__(query, limit)
         results["results"].extend(searx_results)
     
     if "keep" in sources:
-        keep_results = search_keep(query, limit)
+        keep_results = search_keep.__wrapped__(query, limit)
         results["results"].extend(keep_results)
     
     return results
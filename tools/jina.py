@@ -2,7 +2,11 @@ import urllib.request
 import urllib.parse
 
 import os
-import requests
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent))
+from _compact import compact
 
 def _jina_api_key() -> str:
     key = os.environ.get('JINA_API_KEY')
@@ -10,6 +14,7 @@ def _jina_api_key() -> str:
         raise EnvironmentError("JINA_API_KEY environment variable is not set")
     return key
 
+@compact(strip=True)
 def fetch_url(url: str) -> str:
     """Fetch readable text content from a URL using Jina AI reader.
     
@@ -24,6 +29,7 @@ def fetch_url(url: str) -> str:
 fetch_url.safe = True
 
 
+@compact
 def search_web(query: str) -> str:
     """Search the web and return results including titles, URLs and snippets.
 
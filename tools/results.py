@@ -0,0 +1,33 @@
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent))
+from _compact import RESULTS_DIR, CHARS_PER_TOKEN, budget_for
+
+
+def get_result(handle: str, offset: int = 0) -> str:
+    """Read the full text of a tool result that was compacted or truncated.
+
+    Parameters
+    ----------
+    handle : str
+        The handle shown in the compacted result.
+    offset : int
+        Character offset to continue reading from (default 0).
+    Returns
+    -------
+    str
+        One page of the stored result, with the offset of the next page if there is more.
+    """
+    path = RESULTS_DIR / f"{Path(handle).name}.txt"
+    if not path.exists():
+        return f"No stored result with handle '{handle}'."
+    text = path.read_text()
+    page = budget_for("results.get_result") * CHARS_PER_TOKEN
+    chunk = text[offset:offset + page]
+    if offset + page < len(text):
+        chunk += f"\n\n[more: results.get_result(handle=\"{handle}\", offset={offset + page})]"
+    return chunk
+
+
+get_result.safe = True
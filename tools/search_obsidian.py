@@ -5,9 +5,13 @@ Description: Search Obsidian vault using ripgrep
 
 import subprocess
 import json
+import sys
 import tomllib
 from pathlib import Path
 
+sys.path.append(str(Path(__file__).parent))
+from _compact import compact
+
 CONFIG_PATH = Path(__file__).parent.parent / "config.toml"
 
 
@@ -16,6 +20,7 @@ def _load_config():
         return tomllib.load(f)
 
 
+@compact
 def execute(query: str, max_results: int = 5) -> dict:
     """
     Search Obsidian vault
@@ -1,7 +1,12 @@
-import requests
+import sys
+from pathlib import Path
 from typing import List, Dict
 
+sys.path.append(str(Path(__file__).parent))
+from _compact import compact
 
+
+@compact
 def search_searxng(query: str, limit: int = 5) -> List[Dict[str, str]]:
     """Search the public SearxNG instance at ``https://searx.osmosis.page``.
 
@@ -25,6 +30,8 @@ def search_searxng(query: str, limit: int = 5) -> List[Dict[str, str]]:
         ``snippet`` fields.  If the request fails or the response cannot be
         parsed, an empty list is returned.
     """
+    import requests
+
     base_url = "https://searx.osmosis.page/search"
     params = {
         "q": query,
@@ -1,15 +1,49 @@
+import json
+import time
 import platform
-import psutil
 from typing import Dict, Any
 
+# Written by the bot's admission controller (admission.py)
+SNAPSHOT_FILE = "/tmp/dotprompt_system.json"
+SNAPSHOT_MAX_AGE = 30
+
+
+def _cached_snapshot():
+    try:
+        with open(SNAPSHOT_FILE) as f:
+            snapshot = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+    if time.time() - snapshot.get("time", 0) > SNAPSHOT_MAX_AGE:
+        return None
+    return snapshot
+
+
 def run() -> Dict[str, Any]:
     """Collect basic system information.
 
     Returns
     -------
     dict
-        A dictionary containing OS, release, version, CPU count, and memory stats.
+        A dictionary containing OS, release, version, CPU count, load, and memory stats.
     """
+    snapshot = _cached_snapshot()
+    if snapshot is None:
+        import os
+        import psutil
+
+        memory = psutil.virtual_memory()
+        snapshot = {
+            "cpu_count": psutil.cpu_count(logical=True),
+            "load": os.getloadavg(),
+            "memory": {
+                "total": memory.total,
+                "available": memory.available,
+                "used": memory.used,
+                "percent": memory.percent,
+            },
+        }
+
     info: Dict[str, Any] = {
         "system": platform.system(),
         "node": platform.node(),
@@ -17,13 +51,9 @@ def run() -> Dict[str, Any]:
         "version": platform.version(),
         "machine": platform.machine(),
         "processor": platform.processor(),
-        "cpu_count": psutil.cpu_count(logical=True),
-        "memory": {
-            "total": psutil.virtual_memory().total,
-            "available": psutil.virtual_memory().available,
-            "used": psutil.virtual_memory().used,
-            "percent": psutil.virtual_memory().percent,
-        },
+        "cpu_count": snapshot["cpu_count"],
+        "load": snapshot["load"],
+        "memory": snapshot["memory"],
     }
     return info
 
@@ -0,0 +1,31 @@
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent))
+from _parallel import load_tool, run_parallel
+
+
+def get_overview() -> str:
+    """
+    Return today's calendar events and today's todo file in one call.
+
+    Both are fetched concurrently; use this instead of calling
+    calendar.get_today_events and todo.get_todos one after the other.
+    """
+    calendar = load_tool("calendar")
+    todo = load_tool("todo")
+    events, todos = run_parallel([
+        (calendar.get_today_events, (), {}),
+        (todo.get_todos, (), {}),
+    ])
+    if isinstance(events, Exception):
+        events = f"(error fetching calendar: {events})"
+    if isinstance(todos, Exception):
+        todos = f"(error reading todo file: {todos})"
+    return f"# Calendar\n{events}\n\n# Todo file\n{todos}"
+
+
+get_overview.safe = True
+
+if __name__ == "__main__":
+    print(get_overview())